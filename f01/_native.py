@@ -0,0 +1,32 @@
+"""
+Native/viper kernels for MicroPython. Import through f01.kernels, which falls back to pure Python.
+"""
+import micropython
+
+
+@micropython.viper
+def unmask(data, mask):
+    buf = ptr8(data)
+    key = ptr8(mask)
+    n = int(len(data))
+    i = 0
+    while i < n:
+        buf[i] = buf[i] ^ key[i & 3]
+        i += 1
+
+
+@micropython.viper
+def lerp(start: int, end: int, i: int, steps: int) -> int:
+    return start + (end - start) * i // steps
+
+
+@micropython.native
+def map_speed(speed: int, correction: float) -> int:
+    # Float correction factor rules out viper, so keep the Python body under the native emitter
+    speed = max(-100, min(100, speed))
+    speed = int(speed * correction)
+    if speed == 0:
+        return 0
+    sign = 1 if speed > 0 else -1
+    speed = max(1, min(100, abs(speed)))
+    return sign * int((speed / 100) * 65535)
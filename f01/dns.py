@@ -0,0 +1,92 @@
+import socket
+
+import uasyncio
+
+DNS_PORT: int = 53
+DNS_MAX_PACKET: int = 512
+DNS_TTL: int = 60
+
+# Header flags: standard response, recursion desired + available, no error
+DNS_FLAGS: bytes = b"\x81\x80"
+# Compressed pointer to the question name, type A, class IN
+DNS_ANSWER_PREFIX: bytes = b"\xc0\x0c\x00\x01\x00\x01"
+DNS_QTYPE_A: bytes = b"\x00\x01"
+
+
+def wait_readable(sock: socket.socket) -> object:
+    """
+    Awaitable that sleeps until sock is readable.
+    Uses uasyncio's private I/O queue, the same call uasyncio.StreamReader.read makes.
+    Requires uasyncio v3 (MicroPython 1.13 or later).
+    """
+    yield uasyncio.core._io_queue.queue_read(sock)
+
+
+class DnsServer:
+    """
+    Minimal captive-portal DNS responder for Access Point mode.
+    Answers every A query with the robot's IP so clients reach the control page immediately.
+    """
+
+    def __init__(self, ip: str, address: str = "0.0.0.0", port: int = DNS_PORT) -> None:
+        self.ip: str = ip
+        self.address: str = address
+        self.port: int = port
+        self.sock: socket.socket | None = None
+        # Everything after the name pointer is the same for every answer
+        self._answer: bytes = (
+            DNS_ANSWER_PREFIX
+            + DNS_TTL.to_bytes(4, "big")
+            + b"\x00\x04"
+            + bytes(int(octet) for octet in ip.split("."))
+        )
+
+    def build_response(self, query: bytes) -> bytes | None:
+        """
+        Builds a response to the first question of a DNS query. Returns None for malformed packets.
+        Non-A queries (such as AAAA) get an empty answer so clients fall back to IPv4.
+        """
+        if len(query) < 12 or query[2] & 0x80:
+            return None
+        if query[4] == 0 and query[5] == 0:
+            return None  # No question to answer
+        end = 12
+        while end < len(query) and query[end] != 0:
+            end += query[end] + 1
+        end += 5  # Zero label, qtype, qclass
+        if end > len(query):
+            return None
+        question = query[12:end]
+        answer_a = question[-4:-2] == DNS_QTYPE_A
+        header = (
+            query[:2]
+            + DNS_FLAGS
+            + b"\x00\x01"
+            + (b"\x00\x01" if answer_a else b"\x00\x00")
+            + b"\x00\x00\x00\x00"
+        )
+        if answer_a:
+            return header + question + self._answer
+        return header + question
+
+    async def run(self) -> None:
+        """
+        Answers lookups as soon as they arrive without blocking the event loop.
+        """
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(socket.getaddrinfo(self.address, self.port)[0][-1])
+        self.sock.setblocking(False)
+        print(f"F0.1 DNS responder answering with {self.ip}")
+        while True:
+            await wait_readable(self.sock)
+            try:
+                query, addr = self.sock.recvfrom(DNS_MAX_PACKET)
+            except OSError:
+                continue
+            try:
+                response = self.build_response(query)
+                if response is not None:
+                    self.sock.sendto(response, addr)
+            except Exception as e:
+                print(f"DNS error: {e}")
@@ -0,0 +1,85 @@
+from time import ticks_diff, ticks_ms
+
+from machine import Timer
+
+from f01.motor import Motor
+
+FAILSAFE_TIMEOUT_MS: int = 250
+FAILSAFE_PERIOD_MS: int = 50
+
+
+class Failsafe:
+    """
+    Deadman switch driven by a hardware timer, independent of the uasyncio loop.
+    Cuts all motors when no command has been accepted for timeout_ms, and keeps them cut until the next feed().
+    """
+
+    def __init__(
+        self,
+        motors: list[Motor],
+        timeout_ms: int = FAILSAFE_TIMEOUT_MS,
+        period_ms: int = FAILSAFE_PERIOD_MS,
+        timer: Timer | None = None,
+    ) -> None:
+        self.motors: list[Motor] = motors
+        self.timeout_ms: int = timeout_ms
+        self.period_ms: int = period_ms
+        self.timer: Timer = timer if timer is not None else Timer()
+        self.tripped: bool = False
+        self.trips: int = 0  # Incremented on every trip, so readers notice trips that feed() already cleared
+        self._last_feed: int = ticks_ms()
+        self._applied: tuple[int, int] | None = None
+        self._applied_trips: int = 0
+
+    def feed(self) -> None:
+        """
+        Records an accepted command. Call from every input path.
+        """
+        self._last_feed = ticks_ms()
+        self.tripped = False
+
+    def needs_update(self, command: tuple[int, int]) -> bool:
+        """
+        Returns True if command should be written to the motors, and records it as written.
+        That is when it differs from the last written command, or a trip cut the motors since then,
+        even if feed() already cleared the trip. Returns False while tripped.
+        """
+        if self.trips != self._applied_trips:
+            self._applied_trips = self.trips
+            self._applied = None
+        if self.tripped or command == self._applied:
+            return False
+        self._applied = command
+        return True
+
+    def forget_command(self) -> None:
+        """
+        Makes the next needs_update() return True, e.g. after a motion program drove the motors.
+        """
+        self._applied = None
+
+    def cut_since_command(self) -> bool:
+        """
+        Returns True if the motors were cut after the last command written through needs_update().
+        """
+        return self.tripped or self.trips != self._applied_trips
+
+    def check(self, timer: Timer | None = None) -> None:
+        """
+        Timer callback. Allocation-free, so it is safe in IRQ context.
+        Re-cuts on every tick while expired, so an in-flight ramp cannot restart the motors.
+        """
+        if ticks_diff(ticks_ms(), self._last_feed) <= self.timeout_ms:
+            return
+        if not self.tripped:
+            self.tripped = True
+            self.trips += 1
+        for motor in self.motors:
+            motor.cut()
+
+    def start(self) -> None:
+        self._last_feed = ticks_ms()
+        self.timer.init(mode=Timer.PERIODIC, period=self.period_ms, callback=self.check)
+
+    def stop(self) -> None:
+        self.timer.deinit()
@@ -0,0 +1,47 @@
+"""
+Hot numeric kernels shared by Motor, Led, and WebServer.
+
+The native/viper implementations from f01/_native.py are selected at import time.
+On CPython, or on ports built without native emitters, the pure-Python versions below are used instead.
+"""
+
+
+def py_unmask(data: bytearray, mask: bytes) -> None:
+    """
+    XOR a WebSocket payload in place with its 4-byte mask.
+    """
+    for i in range(len(data)):
+        data[i] ^= mask[i & 3]
+
+
+def py_lerp(start: int, end: int, i: int, steps: int) -> int:
+    """
+    Integer linear interpolation between start and end at step i of steps.
+    """
+    return start + (end - start) * i // steps
+
+
+def py_map_speed(speed: int, correction: float) -> int:
+    """
+    Map speed from 1-100 to 0-65535 for PWM, applying correction factor.
+    """
+    speed = max(-100, min(100, speed))
+    speed = int(speed * correction)
+    if speed == 0:
+        return 0
+    sign = 1 if speed > 0 else -1
+    speed = max(1, min(100, abs(speed)))
+    return sign * int((speed / 100) * 65535)
+
+
+try:
+    from f01._native import lerp, map_speed, unmask
+
+    NATIVE: bool = True
+except (ImportError, SyntaxError) as e:
+    # No micropython module (CPython) or no native emitter on this port
+    print(f"Native kernels unavailable, using Python fallback: {e}")
+    unmask = py_unmask
+    lerp = py_lerp
+    map_speed = py_map_speed
+    NATIVE = False
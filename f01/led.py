@@ -1,6 +1,8 @@
 import uasyncio
 from machine import Pin, PWM
 
+from f01.kernels import lerp
+
 class Led:
     def __init__(self, pin_name: str = "LED") -> None:
         self.pin: Pin = Pin(pin_name, Pin.OUT)
@@ -24,12 +26,12 @@ class Led:
         if self.pwm is None:
             self.pin.value(1 if target_bright > 0 else 0)
             return
-        current = self._get_pwm() / 65535 * 100
+        current = self._get_pwm()
+        target = int(65535 * (target_bright / 100))
         steps = 20
         step_time = duration_ms // steps
         for i in range(1, steps + 1):
-            bright = current + (target_bright - current) * i / steps
-            self._set_pwm(bright)
+            self.pwm.duty_u16(lerp(current, target, i, steps))
             await uasyncio.sleep_ms(step_time)
 
     async def on(self, bright: float = 100, smooth: float = 0) -> None:
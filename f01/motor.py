@@ -1,6 +1,8 @@
 from machine import Pin, PWM
 import uasyncio
 
+from f01.kernels import lerp, map_speed
+
 class Motor:
     def __init__(self, in1_pin: int, in2_pin: int, freq: int = 1000, correction: float = 1.0) -> None:
         self.in1_pwm: PWM = PWM(Pin(in1_pin))
@@ -15,13 +17,7 @@ class Motor:
         """
         Map speed from 1-100 to 0-65535 for PWM, applying correction factor.
         """
-        speed = max(-100, min(100, speed))
-        speed = int(speed * self.correction)
-        if speed == 0:
-            return 0
-        sign = 1 if speed > 0 else -1
-        speed = max(1, min(100, abs(speed)))
-        return sign * int((speed / 100) * 65535)
+        return map_speed(speed, self.correction)
 
     async def _ramp_pwm(self, target_in1: int, target_in2: int, ramp_time: float = 0.1, steps: int = 3) -> None:
         """
@@ -35,18 +31,25 @@ class Motor:
             self._last_in1 = target_in1
             self._last_in2 = target_in2
             return
-        step_in1 = (target_in1 - current_in1) / steps
-        step_in2 = (target_in2 - current_in2) / steps
         delay = ramp_time / steps
         for i in range(1, steps + 1):
-            next_in1 = int(current_in1 + step_in1 * i)
-            next_in2 = int(current_in2 + step_in2 * i)
+            next_in1 = lerp(current_in1, target_in1, i, steps)
+            next_in2 = lerp(current_in2, target_in2, i, steps)
             self.in1_pwm.duty_u16(next_in1)
             self.in2_pwm.duty_u16(next_in2)
             self._last_in1 = next_in1
             self._last_in2 = next_in2
             await uasyncio.sleep(delay)
 
+    def cut(self) -> None:
+        """
+        Immediately drive both pins low without ramping. Safe to call from a timer callback.
+        """
+        self.in1_pwm.duty_u16(0)
+        self.in2_pwm.duty_u16(0)
+        self._last_in1 = 0
+        self._last_in2 = 0
+
     async def forward(self, speed: int, ramp_time: float = 0.1, steps: int = 3) -> None:
         """
         Set motor to move forward at given speed (1-100), with optional ramping.
@@ -0,0 +1,129 @@
+from time import ticks_diff, ticks_us
+
+import uasyncio
+
+SUMMARY_COLUMNS: tuple[str, ...] = ("task", "slices", "avg_us", "max_us", "over")
+SUMMARY_ROW: str = "{:<16}{:>8}{:>10}{:>10}{:>8}"
+
+
+class TaskStats:
+    """
+    Run-slice statistics for one task name, in microseconds.
+    """
+
+    def __init__(self) -> None:
+        self.clear()
+
+    def clear(self) -> None:
+        self.slices: int = 0
+        self.total_us: int = 0
+        self.max_us: int = 0
+        self.over_budget: int = 0
+
+    def record(self, duration_us: int, budget_us: int) -> bool:
+        """
+        Adds one sample. Returns True if the sample exceeds the budget.
+        """
+        self.slices += 1
+        self.total_us += duration_us
+        if duration_us > self.max_us:
+            self.max_us = duration_us
+        if duration_us > budget_us:
+            self.over_budget += 1
+            return True
+        return False
+
+    def line(self, name: str) -> str:
+        avg_us = self.total_us // self.slices if self.slices else 0
+        return SUMMARY_ROW.format(name, self.slices, avg_us, self.max_us, self.over_budget)
+
+
+class Profiler:
+    """
+    Opt-in profiler for the shared uasyncio loop.
+    Measures how long each wrapped task runs between awaits and how late the loop wakes sleepers.
+    """
+
+    def __init__(self, budget_us: int = 5000, verbose: bool = True) -> None:
+        self.budget_us: int = budget_us
+        self.verbose: bool = verbose  # Print every over-budget slice to serial
+        self.tasks: dict[str, TaskStats] = {}
+        self.lag: TaskStats = TaskStats()
+
+    def _stats(self, name: str) -> TaskStats:
+        stats = self.tasks.get(name)
+        if stats is None:
+            stats = TaskStats()
+            self.tasks[name] = stats
+        return stats
+
+    def _record(self, name: str, stats: TaskStats, duration_us: int) -> None:
+        if stats.record(duration_us, self.budget_us) and self.verbose:
+            print(f"[profiler] {name} ran {duration_us} us without yielding")
+
+    def wrap(self, name: str, coro: object) -> object:
+        """
+        Returns a generator that drives coro and times every slice between awaits.
+        uasyncio schedules through the current task, so yielded values pass straight through.
+        """
+        stats = self._stats(name)
+        send_value = None
+        error = None
+        while True:
+            start = ticks_us()
+            try:
+                if error is None:
+                    yielded = coro.send(send_value)
+                else:
+                    yielded = coro.throw(error)
+                    error = None
+            except StopIteration as e:
+                return e.value
+            finally:
+                # Also counts slices that end in a crash or cancellation
+                self._record(name, stats, ticks_diff(ticks_us(), start))
+            try:
+                send_value = yield yielded
+            except BaseException as e:
+                # Forward cancellation and other thrown exceptions to the wrapped task
+                error = e
+
+    async def monitor_lag(self, interval_ms: int = 100) -> None:
+        """
+        Measures scheduling lag: how much later than requested a sleeping task is resumed.
+        """
+        while True:
+            start = ticks_us()
+            await uasyncio.sleep_ms(interval_ms)
+            lag_us = max(0, ticks_diff(ticks_us(), start) - interval_ms * 1000)
+            if self.lag.record(lag_us, self.budget_us) and self.verbose:
+                print(f"[profiler] loop woke a sleeper {lag_us} us late")
+
+    def summary(self) -> str:
+        """
+        Returns a plain-text table of per-task slices and loop lag.
+        """
+        lines = [
+            f"budget {self.budget_us} us",
+            SUMMARY_ROW.format(*SUMMARY_COLUMNS),
+        ]
+        for name in sorted(self.tasks):
+            lines.append(self.tasks[name].line(name))
+        lines.append(self.lag.line("(loop lag)"))
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        """
+        Clears all samples in place, so running wrapped tasks keep reporting.
+        """
+        for stats in self.tasks.values():
+            stats.clear()
+        self.lag.clear()
+
+    async def report(self, interval_ms: int = 10000) -> None:
+        """
+        Periodically prints the summary to serial.
+        """
+        while True:
+            await uasyncio.sleep_ms(interval_ms)
+            print(self.summary())
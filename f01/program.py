@@ -0,0 +1,176 @@
+from time import ticks_add, ticks_diff, ticks_ms
+
+import uasyncio
+import ujson
+
+from f01.kernels import lerp
+
+PROGRAM_MAX_BYTES: int = 2048
+PROGRAM_MAX_SEGMENTS: int = 64
+# Programs keep the failsafe fed, so this is how long F0.1 may drive without a link
+PROGRAM_MAX_DURATION_MS: int = 30000
+PROGRAM_TICK_MS: int = 20
+
+PROGRAM_PENDING: str = "pending"
+PROGRAM_RUNNING: str = "running"
+PROGRAM_DONE: str = "done"
+PROGRAM_ABORTED: str = "aborted"
+
+
+class MotionProgram:
+    """
+    Timed motion segments uploaded once and executed on F0.1's own clock.
+    Each segment is [duration_ms, left, right, ramp_ms, led]; ramp_ms and led are optional.
+    Speeds ramp linearly from the previous segment over ramp_ms. led sets the brightness of all outer LEDs (null keeps it).
+    """
+
+    def __init__(self, segments: list[tuple[int, int, int, int, int | None]]) -> None:
+        self.segments: list[tuple[int, int, int, int, int | None]] = segments
+        self.state: str = PROGRAM_PENDING
+        self.segment: int = 0
+        self._started_ms: int = 0
+        self._elapsed_ms: int = 0
+
+    @staticmethod
+    def parse(data: str) -> "MotionProgram":
+        """
+        Parses and validates a JSON program. Raises ValueError on invalid input.
+        """
+        if len(data) > PROGRAM_MAX_BYTES:
+            raise ValueError(f"Program larger than {PROGRAM_MAX_BYTES} bytes")
+        raw = ujson.loads(data)
+        if not isinstance(raw, list) or not raw:
+            raise ValueError("Program must be a non-empty list of segments")
+        if len(raw) > PROGRAM_MAX_SEGMENTS:
+            raise ValueError(f"Program longer than {PROGRAM_MAX_SEGMENTS} segments")
+        segments: list[tuple[int, int, int, int, int | None]] = []
+        total_ms = 0
+        for item in raw:
+            if not isinstance(item, list) or not 3 <= len(item) <= 5:
+                raise ValueError(f"Invalid segment: {item}")
+            try:
+                duration_ms, left, right = int(item[0]), int(item[1]), int(item[2])
+                ramp_ms = int(item[3]) if len(item) > 3 else 0
+                led = int(item[4]) if len(item) > 4 and item[4] is not None else None
+            except TypeError:
+                raise ValueError(f"Invalid segment: {item}")
+            if duration_ms <= 0:
+                raise ValueError(f"Invalid duration: {duration_ms}")
+            total_ms += duration_ms
+            if total_ms > PROGRAM_MAX_DURATION_MS:
+                raise ValueError(f"Program longer than {PROGRAM_MAX_DURATION_MS} ms")
+            if not (-100 <= left <= 100 and -100 <= right <= 100):
+                raise ValueError(f"Invalid speed: {left}, {right}")
+            if not 0 <= ramp_ms <= duration_ms:
+                raise ValueError(f"Invalid ramp: {ramp_ms}")
+            if led is not None and not 0 <= led <= 100:
+                raise ValueError(f"Invalid LED brightness: {led}")
+            segments.append((duration_ms, left, right, ramp_ms, led))
+        return MotionProgram(segments)
+
+    def active(self) -> bool:
+        return self.state == PROGRAM_PENDING or self.state == PROGRAM_RUNNING
+
+    def start(self) -> None:
+        self.state = PROGRAM_RUNNING
+        self._started_ms = ticks_ms()
+
+    def finish(self) -> None:
+        if self.state == PROGRAM_RUNNING:
+            self._elapsed_ms = ticks_diff(ticks_ms(), self._started_ms)
+            self.state = PROGRAM_DONE
+
+    def abort(self) -> None:
+        if self.state == PROGRAM_RUNNING:
+            self._elapsed_ms = ticks_diff(ticks_ms(), self._started_ms)
+        if self.active():
+            self.state = PROGRAM_ABORTED
+
+    def status(self) -> str:
+        """
+        Returns progress as JSON.
+        """
+        elapsed_ms = self._elapsed_ms
+        if self.state == PROGRAM_RUNNING:
+            elapsed_ms = ticks_diff(ticks_ms(), self._started_ms)
+        return ujson.dumps(
+            {
+                "state": self.state,
+                "segment": self.segment,
+                "segments": len(self.segments),
+                "elapsed_ms": elapsed_ms,
+                "duration_ms": sum(s[0] for s in self.segments),
+            }
+        )
+
+
+async def run_program(
+    program: MotionProgram,
+    left_motor: "Motor",
+    right_motor: "Motor",
+    leds: "list[Led]",
+    failsafe: "Failsafe",
+    start: tuple[int, int] = (0, 0),
+    tick_ms: int = PROGRAM_TICK_MS,
+) -> tuple[int, int]:
+    """
+    Runs a motion program against absolute deadlines on the local clock, so timing does not drift.
+    Ramps the first segment from start. Stops when the program is aborted by a manual command or the failsafe trips.
+    Returns the last speeds written to the motors.
+    """
+    applied: tuple[int, int] = start
+    prev_left, prev_right = start
+    failsafe.feed()  # The robot may have idled long enough to trip it
+    if program.state == PROGRAM_PENDING:
+        program.start()
+    deadline: int = ticks_ms()
+
+    async def move(speeds: tuple[int, int]) -> None:
+        await uasyncio.gather(
+            left_motor.throttle(speeds[0], ramp_time=0, steps=0),
+            right_motor.throttle(speeds[1], ramp_time=0, steps=0),
+        )
+
+    try:
+        for index, (duration_ms, left, right, ramp_ms, led) in enumerate(program.segments):
+            program.segment = index
+            segment_start = deadline
+            deadline = ticks_add(deadline, duration_ms)
+            if led is not None and leds:
+                await uasyncio.gather(*[light.on(bright=led) for light in leds])
+            while True:
+                if not program.active():
+                    return applied  # Aborted; manual control takes over
+                if failsafe.tripped:
+                    program.abort()
+                    return (0, 0)
+                failsafe.feed()
+                now = ticks_ms()
+                remaining = ticks_diff(deadline, now)
+                if remaining <= 0:
+                    break
+                elapsed = ticks_diff(now, segment_start)
+                if elapsed < ramp_ms:
+                    speeds = (
+                        lerp(prev_left, left, elapsed, ramp_ms),
+                        lerp(prev_right, right, elapsed, ramp_ms),
+                    )
+                else:
+                    speeds = (left, right)
+                if speeds != applied:
+                    await move(speeds)
+                    applied = speeds
+                await uasyncio.sleep_ms(min(remaining, tick_ms))
+            prev_left, prev_right = left, right
+        applied = (0, 0)
+        await move(applied)
+        program.finish()
+    except Exception as e:
+        print(f"[run_program] Error: {e}")
+        program.abort()
+        applied = (0, 0)
+        await move(applied)
+    finally:
+        # Manual values are re-applied once the program stops driving
+        failsafe.forget_command()
+    return applied
@@ -3,27 +3,60 @@ import ubinascii
 import uhashlib
 import ujson
 
+from f01.kernels import unmask
+from f01.program import PROGRAM_MAX_BYTES, MotionProgram
+
 HTML_PATH: str = "f01/motor_controls.html"
 MAX_CLIENTS: int = 2
+PROGRAM_UPLOAD_TIMEOUT_MS: int = 2000
 
 # Pre-encoded static responses for performance
 RESPONSE_200_OK: str = "HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\n\r\nOK"
 RESPONSE_503: str = f"HTTP/1.1 503 Service Unavailable\r\nContent-Type: text/plain\r\n\r\nOnly {MAX_CLIENTS} controllers can be connected at the same time!."
 RESPONSE_500: str = "HTTP/1.1 500 Internal Server Error\r\nContent-Type: text/plain\r\n\r\nInternal Server Error"
+RESPONSE_JSON_HEADER: str = "HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n\r\n"
+RESPONSE_400_HEADER: str = "HTTP/1.1 400 Bad Request\r\nContent-Type: text/plain\r\n\r\n"
+RESPONSE_408: str = "HTTP/1.1 408 Request Timeout\r\nContent-Type: text/plain\r\n\r\nMotion program upload timed out"
+RESPONSE_411: str = "HTTP/1.1 411 Length Required\r\nContent-Type: text/plain\r\n\r\nMotion programs need a valid Content-Length"
+RESPONSE_404: str = "HTTP/1.1 404 Not Found\r\nContent-Type: text/plain\r\n\r\nNo motion program"
+RESPONSE_413: str = f"HTTP/1.1 413 Payload Too Large\r\nContent-Type: text/plain\r\n\r\nMotion programs are limited to {PROGRAM_MAX_BYTES} bytes"
+
+# Connectivity-check URLs requested by Android, iOS/macOS, and Windows after joining a network
+CAPTIVE_PORTAL_PATHS: tuple[str, ...] = (
+    "/generate_204",
+    "/gen_204",
+    "/hotspot-detect.html",
+    "/library/test/success.html",
+    "/connecttest.txt",
+    "/ncsi.txt",
+    "/redirect",
+    "/canonical.html",
+    "/success.txt",
+)
 
 
 class WebServer:
     """
     Simple async web server for Raspberry Pi Pico W.
     Serves a control page and handles /set? requests for motor control.
+    Accepts motion programs on POST /program and reports their progress on GET /program.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        portal_ip: str | None = None,
+        profiler: "Profiler | None" = None,
+        failsafe: "Failsafe | None" = None,
+    ) -> None:
         self.server: object = None
         self.address: str = "0.0.0.0"
         self.port: int = 80
+        self.portal_ip: str | None = portal_ip  # Set in Access Point mode to answer captive-portal probes
+        self.profiler: "Profiler | None" = profiler  # Set to time handlers and serve /profile
+        self.failsafe: "Failsafe | None" = failsafe  # Fed on every accepted command
         self.last_left: int = 0
         self.last_right: int = 0
+        self.program: MotionProgram | None = None  # Latest uploaded motion program, run by F01
         self._html_cache: str = ""
         self._client_count: int = 0  # Track connected clients
         self._load_html()
@@ -57,6 +90,55 @@ class WebServer:
                 params[k] = v
         return params
 
+    def _accept_command(self) -> None:
+        """
+        Marks a manual command: feeds the failsafe and aborts any running motion program.
+        """
+        if self.failsafe is not None:
+            self.failsafe.feed()
+        if self.program is not None:
+            self.program.abort()
+
+    async def handle_program_upload(self, reader: object, writer: object, content_length: int) -> None:
+        """
+        Validates an uploaded motion program and queues it for F01 to run.
+        """
+        if content_length <= 0:
+            await writer.awrite(RESPONSE_411)
+            return
+        if content_length > PROGRAM_MAX_BYTES:
+            await writer.awrite(RESPONSE_413)
+            return
+        try:
+            # A client that sends less than it declared must not hold a client slot forever
+            body = await uasyncio.wait_for_ms(
+                reader.readexactly(content_length), PROGRAM_UPLOAD_TIMEOUT_MS
+            )
+        except uasyncio.TimeoutError:
+            await writer.awrite(RESPONSE_408)
+            return
+        try:
+            program = MotionProgram.parse(body.decode())
+        except (UnicodeError, ValueError) as e:
+            await writer.awrite(RESPONSE_400_HEADER + str(e))
+            return
+        if self.program is not None:
+            self.program.abort()
+        # Manual control resumes from a standstill once the program ends
+        self.last_left = 0
+        self.last_right = 0
+        self.program = program
+        await writer.awrite(RESPONSE_JSON_HEADER + program.status())
+
+    def is_captive_probe(self, request: str) -> bool:
+        """
+        Returns True if the request line targets a known OS connectivity-check URL.
+        """
+        parts = request.split(" ")
+        if len(parts) < 2:
+            return False
+        return parts[1].split("?", 1)[0] in CAPTIVE_PORTAL_PATHS
+
     async def handle_ws(self, reader, writer):
         """
         Handles WebSocket connections for slider/gamepad updates.
@@ -103,23 +185,28 @@ class WebServer:
                 if masked:
                     mask = await reader.readexactly(4)
                     data = bytearray(await reader.readexactly(length))
-                    for i in range(length):
-                        data[i] ^= mask[i % 4]
+                    unmask(data, mask)
                 else:
                     data = await reader.readexactly(length)
                 if opcode == 8:  # close
                     break
                 if opcode == 1:  # text
+                    accepted = False
                     try:
                         msg = ujson.loads(data.decode())
                         left = msg.get("left")
                         right = msg.get("right")
                         if left is not None:
                             self.last_left = int(left)
+                            accepted = True
                         if right is not None:
                             self.last_right = int(right)
+                            accepted = True
                     except Exception as e:
                         print("WS parse error", e)
+                    # Messages without a valid speed do not count as commands
+                    if accepted:
+                        self._accept_command()
         except Exception as e:
             print("WS error", e)
         await writer.aclose()
@@ -127,44 +214,83 @@ class WebServer:
     async def handle_client(self, reader: object, writer: object) -> None:
         """
         Handles an incoming HTTP client connection. Allows up to MAX_CLIENTS at the same time.
+        Captive-portal probes are answered before the limit check and do not count as clients.
         No special stop logic: left=0 and right=0 means stop.
         """
         incremented: bool = False
         try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            request: str = request_line.decode().strip()
+            if self.portal_ip and self.is_captive_probe(request):
+                while True:
+                    header = await reader.readline()
+                    if not header or header == b"\r\n":
+                        break
+                # Redirect connectivity checks so the OS opens the control page right away
+                await writer.awrite(
+                    f"HTTP/1.1 302 Found\r\nLocation: http://{self.portal_ip}/\r\nContent-Length: 0\r\n\r\n"
+                )
+                return
             if self._client_count >= MAX_CLIENTS:
                 await writer.awrite(RESPONSE_503)
                 return
             self._client_count += 1
             incremented = True
-            request_line = await reader.readline()
-            if not request_line:
-                return
-            request: str = request_line.decode().strip()
             if request.startswith("GET /ws"):
                 await self.handle_ws(reader, writer)
                 return
             # Only read headers if not a /set? request
             is_set = request.startswith("GET /set?")
+            is_upload = request.startswith("POST /program")
+            content_length: int = 0
             if not is_set:
                 while True:
                     header = await reader.readline()
                     if not header or header == b"\r\n":
                         break
+                    if is_upload and header.lower().startswith(b"content-length:"):
+                        try:
+                            content_length = int(header.split(b":", 1)[1].strip())
+                        except ValueError:
+                            content_length = 0  # Rejected with 411 by handle_program_upload
+            if is_upload:
+                await self.handle_program_upload(reader, writer, content_length)
+                return
+            if request.startswith("GET /program"):
+                if self.program is None:
+                    await writer.awrite(RESPONSE_404)
+                else:
+                    await writer.awrite(RESPONSE_JSON_HEADER + self.program.status())
+                return
+            if self.profiler is not None and request.startswith("GET /profile"):
+                if request.startswith("GET /profile?reset"):
+                    self.profiler.reset()
+                await writer.awrite(
+                    "HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\n\r\n" + self.profiler.summary()
+                )
+                return
             if is_set:
                 query: str = request[9:].split(" ")[0]
                 params: dict[str, str] = self.parse_query_params(query)
                 left: str | None = params.get("left")
                 right: str | None = params.get("right")
+                accepted: bool = False
                 if left is not None:
                     try:
                         self.last_left = int(left)
+                        accepted = True
                     except Exception as e:
                         print(f"Invalid left value: {left} ({e})")
                 if right is not None:
                     try:
                         self.last_right = int(right)
+                        accepted = True
                     except Exception as e:
                         print(f"Invalid right value: {right} ({e})")
+                if accepted:
+                    self._accept_command()
                 await writer.awrite(RESPONSE_200_OK)
                 return
             # Serve HTML page
@@ -182,12 +308,19 @@ class WebServer:
             if incremented:
                 self._client_count -= 1
 
+    def _handle_client_profiled(self, reader: object, writer: object) -> object:
+        """
+        Wraps each connection handler with the profiler.
+        """
+        return self.profiler.wrap("http", self.handle_client(reader, writer))
+
     async def run(self) -> None:
         """
         Starts the async web server and waits for connections.
         """
+        handler = self.handle_client if self.profiler is None else self._handle_client_profiled
         self.server = await uasyncio.start_server(
-            self.handle_client, self.address, self.port
+            handler, self.address, self.port
         )
         print(f"F0.1 control server listening on http://{self.address}:{self.port}")
         await self.server.wait_closed()
@@ -8,11 +8,28 @@ except ImportError:
     WIFI_SSID = None
     WIFI_PASSWORD = None
 
+try:
+    from config import PROFILE_BUDGET_MS
+except ImportError:
+    PROFILE_BUDGET_MS = None
+
+try:
+    from config import FAILSAFE_TIMEOUT_MS
+except ImportError:
+    FAILSAFE_TIMEOUT_MS = None
+
+from f01.dns import DnsServer
+from f01.failsafe import FAILSAFE_TIMEOUT_MS as DEFAULT_FAILSAFE_TIMEOUT_MS
+from f01.failsafe import Failsafe
 from f01.led import Led
 from f01.motor import Motor
+from f01.program import PROGRAM_PENDING, MotionProgram, run_program
 from f01.webserver import WebServer
 from f01.wifi import AccessPoint, Station
 
+if PROFILE_BUDGET_MS:
+    from f01.profiler import Profiler
+
 
 class F01:
     def __init__(self) -> None:
@@ -23,9 +40,24 @@ class F01:
         self.led_front_left: Led = Led(15)
         self.left_motor: Motor = Motor(17, 18, correction=0.5)
         self.right_motor: Motor = Motor(19, 20)
+        self.failsafe: Failsafe = Failsafe(
+            [self.left_motor, self.right_motor],
+            timeout_ms=FAILSAFE_TIMEOUT_MS or DEFAULT_FAILSAFE_TIMEOUT_MS,
+        )
+        self._speeds: tuple[int, int] = (0, 0)  # Last speeds written by move()
+
+        self.profiler: "Profiler | None" = (
+            Profiler(budget_us=int(PROFILE_BUDGET_MS * 1000)) if PROFILE_BUDGET_MS else None
+        )
 
         self.station, self.ap = self._connect_wifi_or_ap()
-        self.web_server: WebServer = WebServer()
+        portal_ip: str | None = self.ap.ip if self.ap is not None else None
+        self.web_server: WebServer = WebServer(
+            portal_ip=portal_ip, profiler=self.profiler, failsafe=self.failsafe
+        )
+        self.dns_server: DnsServer | None = (
+            DnsServer(portal_ip) if portal_ip is not None else None
+        )
 
     def _connect_wifi_or_ap(self) -> tuple[Station | None, AccessPoint | None]:
         """
@@ -45,11 +77,35 @@ class F01:
             station = None
         return station, ap
 
+    def task(self, name: str, coro: object) -> object:
+        """Wraps a coroutine with the profiler when profiling is enabled."""
+        if self.profiler is None:
+            return coro
+        return self.profiler.wrap(name, coro)
+
     async def move(self, left_speed: int = 0, right_speed: int = 0) -> None:
         await asyncio.gather(
             self.left_motor.throttle(left_speed, ramp_time=0, steps=0),
             self.right_motor.throttle(right_speed, ramp_time=0, steps=0),
         )
+        self._speeds = (left_speed, right_speed)
+
+    async def run_program(self, program: MotionProgram) -> None:
+        """Runs a motion program, ramping from the current speeds unless the failsafe cut the motors."""
+        start = (0, 0) if self.failsafe.cut_since_command() else self._speeds
+        self._speeds = await run_program(
+            program,
+            self.left_motor,
+            self.right_motor,
+            [
+                self.led_front_left,
+                self.led_front_right,
+                self.led_back_left,
+                self.led_back_right,
+            ],
+            self.failsafe,
+            start=start,
+        )
 
     async def control_from_web_server(self) -> None:
         """Controls the motors based on web server input. LEDs are also updated based on motor speed.
@@ -91,7 +147,7 @@ class F01:
     async def blink_internal_led_until_connected(self) -> None:
         """Blink internal LED until at least one client is connected, then keep it on."""
         blink_task = asyncio.create_task(
-            self.led_internal.blink(interval_ms=500, bright=100, smooth=0)
+            self.task("blink", self.led_internal.blink(interval_ms=500, bright=100, smooth=0))
         )
         while getattr(self.web_server, "_client_count", 0) == 0:
             await asyncio.sleep(0.1)
@@ -110,38 +166,48 @@ class F01:
             self.led_back_left.on(bright=25, smooth=100),
             self.led_back_right.on(bright=25, smooth=100),
         )
+        self.failsafe.start()
         gc_counter = 0
-        last_motor = (None, None)
         last_leds = (None, None, None, None)
         while True:
             try:
-                # Prioritize motor control and change only on value change
-                left_speed = self.web_server.last_left
-                right_speed = self.web_server.last_right
-                if (left_speed, right_speed) != last_motor:
-                    await self.move(left_speed=left_speed, right_speed=right_speed)
-                    last_motor = (left_speed, right_speed)
-                # Only update LEDs if values changed
-                led_front_left_bright = left_speed if left_speed > 25 else 25
-                led_front_right_bright = right_speed if right_speed > 25 else 25
-                led_back_left_bright = abs(left_speed) if left_speed < -25 else 25
-                led_back_right_bright = abs(right_speed) if right_speed < -25 else 25
-                leds = (
-                    led_front_left_bright,
-                    led_front_right_bright,
-                    led_back_left_bright,
-                    led_back_right_bright,
-                )
-                if leds != last_leds:
-                    await asyncio.gather(
-                        self.led_front_left.on(bright=led_front_left_bright, smooth=25),
-                        self.led_front_right.on(
-                            bright=led_front_right_bright, smooth=25
-                        ),
-                        self.led_back_left.on(bright=led_back_left_bright, smooth=25),
-                        self.led_back_right.on(bright=led_back_right_bright, smooth=25),
+                program = self.web_server.program
+                if program is not None and program.active():
+                    if program.state == PROGRAM_PENDING:
+                        program.start()  # Marks it running so only one task is created
+                        asyncio.create_task(
+                            self.task("program", self.run_program(program))
+                        )
+                    # Re-apply manual LED values once the program ends or is aborted
+                    last_leds = (None, None, None, None)
+                else:
+                    # Prioritize motor control and change only on value change
+                    left_speed = self.web_server.last_left
+                    right_speed = self.web_server.last_right
+                    # Writes on change, holds while tripped, and re-applies after a trip
+                    if self.failsafe.needs_update((left_speed, right_speed)):
+                        await self.move(left_speed=left_speed, right_speed=right_speed)
+                    # Only update LEDs if values changed
+                    led_front_left_bright = left_speed if left_speed > 25 else 25
+                    led_front_right_bright = right_speed if right_speed > 25 else 25
+                    led_back_left_bright = abs(left_speed) if left_speed < -25 else 25
+                    led_back_right_bright = abs(right_speed) if right_speed < -25 else 25
+                    leds = (
+                        led_front_left_bright,
+                        led_front_right_bright,
+                        led_back_left_bright,
+                        led_back_right_bright,
                     )
-                    last_leds = leds
+                    if leds != last_leds:
+                        await asyncio.gather(
+                            self.led_front_left.on(bright=led_front_left_bright, smooth=25),
+                            self.led_front_right.on(
+                                bright=led_front_right_bright, smooth=25
+                            ),
+                            self.led_back_left.on(bright=led_back_left_bright, smooth=25),
+                            self.led_back_right.on(bright=led_back_right_bright, smooth=25),
+                        )
+                        last_leds = leds
             except Exception as e:
                 print(f"[run loop] Error: {e}")
             await asyncio.sleep(0.01)
@@ -155,9 +221,16 @@ if __name__ == "__main__":
     try:
         f01 = F01()
         loop = asyncio.get_event_loop()
-        loop.create_task(f01.web_server.run())
-        loop.create_task(f01.run())
-        loop.create_task(f01.blink_internal_led_until_connected())
+        loop.create_task(f01.task("web_server", f01.web_server.run()))
+        if f01.dns_server is not None:
+            loop.create_task(f01.task("dns", f01.dns_server.run()))
+        loop.create_task(f01.task("run", f01.run()))
+        loop.create_task(
+            f01.task("led_internal", f01.blink_internal_led_until_connected())
+        )
+        if f01.profiler is not None:
+            loop.create_task(f01.profiler.monitor_lag())
+            loop.create_task(f01.profiler.report())
         loop.run_forever()
     except Exception as e:
         print(f"[main] Error: {e}")
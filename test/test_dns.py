@@ -0,0 +1,70 @@
+import socket
+
+import uasyncio as asyncio
+from f01.dns import DnsServer, wait_readable
+
+
+def build_query(name: str, qtype: int = 1) -> bytes:
+    question = b""
+    for label in name.split("."):
+        question += bytes([len(label)]) + label.encode()
+    question += b"\x00" + qtype.to_bytes(2, "big") + b"\x00\x01"
+    return b"\xbe\xef\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00" + question
+
+
+def test_dns() -> None:
+    dns = DnsServer("192.168.4.1")
+
+    print("Test A query is answered with the robot's IP")
+    query = build_query("connectivitycheck.gstatic.com")
+    response = dns.build_response(query)
+    assert response is not None
+    assert response[:2] == query[:2], "transaction ID not echoed"
+    assert response[6:8] == b"\x00\x01", "expected one answer"
+    assert response[len(query):len(query) + 2] == b"\xc0\x0c"
+    assert response[-4:] == bytes([192, 168, 4, 1])
+
+    print("Test AAAA query gets an empty answer")
+    response = dns.build_response(build_query("captive.apple.com", qtype=28))
+    assert response is not None
+    assert response[6:8] == b"\x00\x00"
+
+    print("Test malformed and response packets are ignored")
+    assert dns.build_response(b"\x00\x01") is None
+    assert dns.build_response(query[:-3]) is None
+    assert dns.build_response(query[:2] + b"\x81\x80" + query[4:]) is None
+
+    print("Test queries without a question are ignored")
+    assert dns.build_response(query[:4] + b"\x00\x00" + query[6:]) is None
+
+    print("All DNS tests passed")
+
+
+async def query_loopback(port: int, query: bytes) -> bytes:
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.setblocking(False)
+    try:
+        client.sendto(query, socket.getaddrinfo("127.0.0.1", port)[0][-1])
+        await wait_readable(client)
+        return client.recvfrom(512)[0]
+    finally:
+        client.close()
+
+
+async def test_dns_server() -> None:
+    print("Test the responder answers over a loopback socket")
+    dns = DnsServer("192.168.4.1", address="127.0.0.1", port=5353)
+    server_task = asyncio.create_task(dns.run())
+    await asyncio.sleep_ms(50)
+    query = build_query("captive.apple.com")
+    response = await asyncio.wait_for_ms(query_loopback(5353, query), 1000)
+    assert response == dns.build_response(query)
+    assert response[-4:] == bytes([192, 168, 4, 1])
+    server_task.cancel()
+    dns.sock.close()
+    print("All DNS server tests passed")
+
+
+if __name__ == "__main__":
+    test_dns()
+    asyncio.run(test_dns_server())
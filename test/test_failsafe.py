@@ -0,0 +1,103 @@
+import time
+
+import uasyncio as asyncio
+from f01.failsafe import Failsafe
+from f01.motor import Motor
+
+
+class FakeTimer:
+    """
+    Stands in for machine.Timer; fire() runs the callback like a timer tick.
+    """
+
+    def __init__(self) -> None:
+        self.callback = None
+
+    def init(self, mode: int = 0, period: int = 0, callback=None) -> None:
+        self.callback = callback
+
+    def deinit(self) -> None:
+        self.callback = None
+
+    def fire(self) -> None:
+        self.callback(self)
+
+
+def motors_stopped(motors: list[Motor]) -> bool:
+    return all(m.in1_pwm.duty_u16() == 0 and m.in2_pwm.duty_u16() == 0 for m in motors)
+
+
+async def test_failsafe() -> None:
+    left_motor = Motor(17, 18)
+    right_motor = Motor(19, 20)
+    motors = [left_motor, right_motor]
+    failsafe = Failsafe(motors, timeout_ms=250, period_ms=50)
+    failsafe.start()
+
+    print("Test motors keep running while fed")
+    await asyncio.gather(left_motor.throttle(60), right_motor.throttle(60))
+    for _ in range(5):
+        failsafe.feed()
+        await asyncio.sleep_ms(100)
+    assert not failsafe.tripped
+    assert not motors_stopped(motors)
+
+    print("Test motors are cut when commands stop")
+    await asyncio.sleep_ms(400)
+    assert failsafe.tripped
+    assert motors_stopped(motors)
+
+    print("Test recovery when commands resume")
+    failsafe.feed()
+    await asyncio.gather(left_motor.throttle(60), right_motor.throttle(60))
+    assert not failsafe.tripped
+    assert not motors_stopped(motors)
+
+    print("Test motors are cut while the event loop is blocked")
+    failsafe.feed()
+    time.sleep_ms(400)  # Blocks uasyncio; only the timer callback can run
+    assert failsafe.tripped
+    assert motors_stopped(motors)
+
+    print("Test a stalled loop does not leave the motors cut once commands resume")
+    failsafe.feed()
+    assert failsafe.needs_update((60, 60))
+    await asyncio.gather(left_motor.throttle(60), right_motor.throttle(60))
+    assert not failsafe.needs_update((60, 60)), "unchanged command re-applied"
+    time.sleep_ms(400)  # Stalled loop: the timer cuts the motors
+    assert motors_stopped(motors)
+    failsafe.feed()  # Keepalive processed before the control loop runs again
+    assert not failsafe.tripped
+    assert failsafe.needs_update((60, 60)), "same command not re-applied after a trip"
+    await asyncio.gather(left_motor.throttle(60), right_motor.throttle(60))
+    assert not motors_stopped(motors)
+
+    failsafe.stop()
+
+    print("Test a stub timer can drive the failsafe")
+    timer = FakeTimer()
+    failsafe = Failsafe(motors, timeout_ms=100, timer=timer)
+    failsafe.start()
+    assert timer.callback is not None
+    await asyncio.gather(left_motor.throttle(60), right_motor.throttle(60))
+    timer.fire()
+    assert not failsafe.tripped
+    await asyncio.sleep_ms(150)
+    timer.fire()
+    assert failsafe.tripped
+    assert motors_stopped(motors)
+    failsafe.feed()
+    assert not failsafe.tripped
+    assert failsafe.needs_update((60, 60))
+    await asyncio.gather(left_motor.throttle(60), right_motor.throttle(60))
+    timer.fire()
+    assert not motors_stopped(motors)
+    failsafe.stop()
+    assert timer.callback is None
+    await asyncio.gather(left_motor.stop(), right_motor.stop())
+
+    print("All failsafe tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(test_failsafe())
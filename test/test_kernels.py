@@ -0,0 +1,51 @@
+import sys
+
+from f01.kernels import (
+    NATIVE,
+    lerp,
+    map_speed,
+    py_lerp,
+    py_map_speed,
+    py_unmask,
+    unmask,
+)
+
+
+def test_kernels() -> None:
+    print(f"Native kernels: {NATIVE}")
+    if sys.implementation.name == "micropython" and sys.platform == "rp2":
+        assert NATIVE, "native kernels failed to compile on the RP2040"
+
+    print("Test unmask equivalence")
+    mask = bytes([0x12, 0xAB, 0x5C, 0xF0])
+    for length in (0, 1, 3, 4, 5, 64, 125, 300):
+        payload = bytes((i * 7) & 0xFF for i in range(length))
+        expected = bytearray(payload)
+        actual = bytearray(payload)
+        py_unmask(expected, mask)
+        unmask(actual, mask)
+        assert actual == expected, f"unmask mismatch for length {length}"
+        unmask(actual, mask)
+        assert actual == payload, f"unmask not reversible for length {length}"
+
+    print("Test lerp equivalence")
+    for start, end in ((0, 65535), (65535, 0), (0, 0), (32768, 100), (7, 65000)):
+        for steps in (1, 2, 3, 5, 20):
+            for i in range(steps + 1):
+                expected = py_lerp(start, end, i, steps)
+                actual = lerp(start, end, i, steps)
+                assert actual == expected, f"lerp mismatch {start}->{end} {i}/{steps}"
+            assert lerp(start, end, steps, steps) == end
+
+    print("Test map_speed equivalence")
+    for correction in (1.0, 0.5, 0.75, 1.2):
+        for speed in range(-120, 121):
+            expected = py_map_speed(speed, correction)
+            actual = map_speed(speed, correction)
+            assert actual == expected, f"map_speed mismatch {speed} x {correction}"
+
+    print("All kernel tests passed")
+
+
+if __name__ == "__main__":
+    test_kernels()
@@ -0,0 +1,53 @@
+from time import ticks_diff, ticks_us
+
+import uasyncio as asyncio
+from f01.profiler import Profiler
+
+
+def busy_wait_us(duration_us: int) -> None:
+    start = ticks_us()
+    while ticks_diff(ticks_us(), start) < duration_us:
+        pass
+
+
+async def hog() -> str:
+    for _ in range(3):
+        busy_wait_us(20000)
+        await asyncio.sleep_ms(10)
+    return "done"
+
+
+async def polite() -> None:
+    while True:
+        await asyncio.sleep_ms(5)
+
+
+async def test_profiler() -> None:
+    profiler = Profiler(budget_us=10000)
+
+    print("Test wrapped tasks are timed and hogs flagged")
+    lag_task = asyncio.create_task(profiler.monitor_lag(interval_ms=20))
+    polite_task = asyncio.create_task(profiler.wrap("polite", polite()))
+    result = await asyncio.create_task(profiler.wrap("hog", hog()))
+    assert result == "done", "return value not passed through"
+    hog_stats = profiler.tasks["hog"]
+    assert hog_stats.slices == 4, f"expected 4 slices, got {hog_stats.slices}"
+    assert hog_stats.over_budget == 3
+    assert hog_stats.max_us >= 20000
+    assert profiler.tasks["polite"].over_budget == 0
+    assert profiler.lag.slices > 0
+
+    print("Test cancellation reaches the wrapped task")
+    polite_task.cancel()
+    lag_task.cancel()
+    await asyncio.sleep_ms(10)
+    assert polite_task.done()
+
+    print(profiler.summary())
+    profiler.reset()
+    assert hog_stats.slices == 0
+    print("All profiler tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(test_profiler())
@@ -0,0 +1,138 @@
+import time
+
+import uasyncio as asyncio
+import ujson
+from f01.failsafe import Failsafe
+from f01.motor import Motor
+from f01.program import (
+    PROGRAM_ABORTED,
+    PROGRAM_DONE,
+    PROGRAM_PENDING,
+    PROGRAM_RUNNING,
+    MotionProgram,
+    run_program,
+)
+
+
+def expect_invalid(data: str) -> None:
+    try:
+        MotionProgram.parse(data)
+    except ValueError:
+        return
+    raise AssertionError(f"Accepted invalid program: {data}")
+
+
+def test_program() -> None:
+    print("Test parsing with optional ramp and LED fields")
+    program = MotionProgram.parse("[[1000, 60, 60], [500, 60, -60, 200], [300, 0, 0, 0, 100]]")
+    assert program.segments == [
+        (1000, 60, 60, 0, None),
+        (500, 60, -60, 200, None),
+        (300, 0, 0, 0, 100),
+    ]
+    assert program.state == PROGRAM_PENDING
+
+    print("Test invalid programs are rejected")
+    expect_invalid("[]")
+    expect_invalid("{\"left\": 50}")
+    expect_invalid("[[0, 50, 50]]")
+    expect_invalid("[[1000, 150, 50]]")
+    expect_invalid("[[1000, 50, 50, 2000]]")
+    expect_invalid("[[1000, 50, 50, 0, 101]]")
+    expect_invalid("[[1000, 50]]")
+    expect_invalid(ujson.dumps([[10, 0, 0]] * 65))
+    expect_invalid("[[20000, 50, 50], [20000, 50, 50]]")
+    expect_invalid("[[null, 1, 1]]")
+    expect_invalid("[[[1], 1, 1]]")
+    expect_invalid("[[1000, 1, 1, 0, {}]]")
+    expect_invalid("[[1000, 1, 1, null]]")
+
+    print("Test progress reporting")
+    program.start()
+    time.sleep_ms(50)
+    status = ujson.loads(program.status())
+    assert status["state"] == PROGRAM_RUNNING
+    assert status["segments"] == 3
+    assert status["duration_ms"] == 1800
+    assert status["elapsed_ms"] >= 50
+    program.finish()
+    assert program.state == PROGRAM_DONE
+
+    print("Test abort only affects active programs")
+    program.abort()
+    assert program.state == PROGRAM_DONE
+    program = MotionProgram.parse("[[1000, 60, 60]]")
+    program.start()
+    program.abort()
+    assert program.state == PROGRAM_ABORTED
+    assert not program.active()
+
+    print("All motion program tests passed")
+
+
+def duties(motor: Motor) -> tuple[int, int]:
+    return motor.in1_pwm.duty_u16(), motor.in2_pwm.duty_u16()
+
+
+async def test_run_program() -> None:
+    left_motor = Motor(17, 18)
+    right_motor = Motor(19, 20)
+    failsafe = Failsafe([left_motor, right_motor], timeout_ms=250, period_ms=50)
+    failsafe.start()
+    full = left_motor._map_speed(100)
+
+    print("Test segment deadlines are kept")
+    program = MotionProgram.parse("[[200, 60, 60], [200, -60, -60]]")
+    start = time.ticks_ms()
+    task = asyncio.create_task(run_program(program, left_motor, right_motor, [], failsafe))
+    await asyncio.sleep_ms(100)
+    assert duties(left_motor)[0] > 0 and duties(left_motor)[1] == 0, "first segment not forward"
+    await asyncio.sleep_ms(200)
+    assert program.segment == 1
+    assert duties(right_motor)[0] == 0 and duties(right_motor)[1] > 0, "second segment not backward"
+    assert await task == (0, 0)
+    took = time.ticks_diff(time.ticks_ms(), start)
+    assert 400 <= took < 440, f"program took {took} ms instead of 400"
+    assert program.state == PROGRAM_DONE
+    assert duties(left_motor) == (0, 0) and duties(right_motor) == (0, 0)
+
+    print("Test ramps interpolate between segments")
+    program = MotionProgram.parse("[[400, 100, 100, 400]]")
+    task = asyncio.create_task(run_program(program, left_motor, right_motor, [], failsafe))
+    await asyncio.sleep_ms(200)
+    mid = duties(left_motor)[0]
+    assert full // 4 < mid < full * 3 // 4, f"mid-ramp duty {mid} not halfway"
+    await asyncio.sleep_ms(150)
+    assert duties(left_motor)[0] > mid
+    await task
+
+    print("Test a manual command aborts the program and manual values are re-applied")
+    assert failsafe.needs_update((30, 30))
+    assert not failsafe.needs_update((30, 30))
+    program = MotionProgram.parse("[[1000, 60, 60]]")
+    task = asyncio.create_task(
+        run_program(program, left_motor, right_motor, [], failsafe, start=(30, 30))
+    )
+    await asyncio.sleep_ms(100)
+    program.abort()  # What WebServer does on /set and WebSocket commands
+    await asyncio.sleep_ms(30)
+    assert task.done(), "program kept running after abort"
+    assert program.state == PROGRAM_ABORTED
+    assert failsafe.needs_update((30, 30)), "manual values not re-applied after the program"
+
+    print("Test a failsafe trip aborts the program")
+    program = MotionProgram.parse("[[1000, 60, 60]]")
+    task = asyncio.create_task(run_program(program, left_motor, right_motor, [], failsafe))
+    await asyncio.sleep_ms(100)
+    time.sleep_ms(400)  # Stalled loop: the timer trips the failsafe and cuts the motors
+    assert await task == (0, 0)
+    assert program.state == PROGRAM_ABORTED
+    assert duties(left_motor) == (0, 0) and duties(right_motor) == (0, 0)
+
+    failsafe.stop()
+    print("All motion program runner tests passed")
+
+
+if __name__ == "__main__":
+    test_program()
+    asyncio.run(test_run_program())